@@ -21,47 +21,95 @@ from __future__ import annotations
 
 import argparse
 import json
+import mmap
 import os
-import re
 import sys
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+# orjson is optional; it parses raw bytes several times faster than json
+_loads: Callable[[Union[bytes, str]], Any]
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 
 MAX_OUTPUT_LINES = 8
 MAX_OUTPUT_CHARS = 500
+READ_BUFFER_SIZE = 1 << 20
+WRITE_BATCH_SIZE = 256  # buffered output chunks per writelines() call
+MAX_PENDING_TOOLS = 4096  # unmatched tool calls remembered for result naming
 
+# Command wrapper tags removed together with their body
+_DROPPED_TAGS = ("command-message", "command-args")
 
-def _iter_jsonl(path: Path) -> Iterable[Dict[str, Any]]:
-    with path.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+# System injections that show up as user messages
+_INJECTED_PREFIXES = ("Caveat:", "This session is being continued")
+_SKIP_USER_PREFIXES = _INJECTED_PREFIXES + (
+    "With your Claude Max subscription",
+    "[Request interrupted",
+)
+
+
+def _iter_lines(lines: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    for line in lines:
+        # Blank lines are the only ones worth skipping before the parser;
+        # whitespace-only lines still fail to parse and are dropped below
+        if line == b"\n" or line == b"\r\n":
+            continue
+        try:
+            rec = _loads(line)
+        except ValueError:
+            # Undecodable bytes are replaced rather than dropping the record
             try:
-                yield json.loads(line)
-            except json.JSONDecodeError:
+                rec = json.loads(line.decode("utf-8", errors="replace"))
+            except ValueError:
                 continue
+        yield rec
 
 
-def _iter_stdin() -> Iterable[Dict[str, Any]]:
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
+def _iter_mapped_lines(mm: mmap.mmap) -> Iterator[bytes]:
+    # Same slices readline() would return, newline included
+    find = mm.find
+    size = len(mm)
+    start = 0
+    while start < size:
+        end = find(b"\n", start) + 1 or size
+        yield mm[start:end]
+        start = end
+
+
+def _iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("rb", buffering=READ_BUFFER_SIZE) as f:
         try:
-            yield json.loads(line)
-        except json.JSONDecodeError:
-            continue
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Empty files and pipes cannot be mapped
+            yield from _iter_lines(f)
+            return
+        with mm:
+            yield from _iter_lines(_iter_mapped_lines(mm))
+
+
+def _iter_stdin() -> Iterator[Dict[str, Any]]:
+    with open(sys.stdin.fileno(), "rb", buffering=READ_BUFFER_SIZE, closefd=False) as f:
+        yield from _iter_lines(f)
 
 
 def _truncate(text: str, max_lines: int = MAX_OUTPUT_LINES, max_chars: int = MAX_OUTPUT_CHARS) -> str:
     if not text:
         return ""
+    if len(text) <= max_chars and "\n" not in text:
+        return text
     
-    lines = text.split("\n")
-    if len(lines) > max_lines:
-        text = "\n".join(lines[:max_lines]) + f"\n  ... ({len(lines) - max_lines} more lines)"
+    # Count first so short outputs never allocate a list of lines
+    newlines = text.count("\n")
+    if newlines >= max_lines:
+        head = text.split("\n", max_lines)[:max_lines]
+        text = "\n".join(head) + f"\n  ... ({newlines + 1 - max_lines} more lines)"
     
     if len(text) > max_chars:
         text = text[:max_chars] + f"... ({len(text) - max_chars} more chars)"
@@ -76,6 +124,13 @@ def _extract_text_from_content(content: Any) -> str:
     if isinstance(content, str):
         return content.strip()
     if isinstance(content, list):
+        # Most content is a single text block; skip the list + join for it
+        if len(content) == 1:
+            item = content[0]
+            if isinstance(item, dict) and item.get("type") == "text":
+                text = item.get("text", "")
+                return text.strip() if isinstance(text, str) else ""
+            return ""
         parts = []
         for item in content:
             if isinstance(item, dict) and item.get("type") == "text":
@@ -86,23 +141,107 @@ def _extract_text_from_content(content: Any) -> str:
     return ""
 
 
+def _tag_text(content: str, tag: str, allow_empty: bool = False) -> Optional[str]:
+    """Return the text of the first <tag>...</tag> whose body holds no '<'"""
+    open_tag = f"<{tag}>"
+    close_tag = f"</{tag}>"
+    start = content.find(open_tag)
+    while start >= 0:
+        body = start + len(open_tag)
+        end = content.find("<", body)
+        if end < 0:
+            return None
+        if (allow_empty or end > body) and content.startswith(close_tag, end):
+            return content[body:end]
+        start = content.find(open_tag, start + 1)
+    return None
+
+
+def _replace_tag(content: str, tag: str, keep_body: bool) -> str:
+    """Replace each <tag>body</tag> (body without '<') with [body], or drop it"""
+    open_tag = f"<{tag}>"
+    close_tag = f"</{tag}>"
+    start = content.find(open_tag)
+    if start < 0:
+        return content
+    parts = []
+    pos = 0
+    while start >= 0:
+        body = start + len(open_tag)
+        end = content.find("<", body)
+        if end < 0:
+            break
+        if (end > body or not keep_body) and content.startswith(close_tag, end):
+            parts.append(content[pos:start])
+            if keep_body:
+                parts.append(f"[{content[body:end]}]")
+            pos = end + len(close_tag)
+            start = content.find(open_tag, pos)
+        else:
+            start = content.find(open_tag, start + 1)
+    parts.append(content[pos:])
+    return "".join(parts)
+
+
 def _clean_xml_content(content: str) -> str:
     """Extract meaningful content from XML-wrapped command output"""
     if not content:
         return content
     
     # Extract stdout content
-    stdout_match = re.search(r'<local-command-stdout>([^<]*)</local-command-stdout>', content)
-    if stdout_match:
-        return stdout_match.group(1).strip()
+    stdout = _tag_text(content, "local-command-stdout", allow_empty=True)
+    if stdout is not None:
+        return stdout.strip()
     
-    # Remove XML tags but preserve content
-    content = re.sub(r'<command-name>([^<]+)</command-name>', r'[\1]', content)
-    content = re.sub(r'<command-message>[^<]*</command-message>', '', content)
-    content = re.sub(r'<command-args>[^<]*</command-args>', '', content)
-    content = re.sub(r'<[^>]+>', '', content)
+    # Unwrap command names and drop command messages/args
+    content = _replace_tag(content, "command-name", keep_body=True)
+    for tag in _DROPPED_TAGS:
+        content = _replace_tag(content, tag, keep_body=False)
     
-    return content.strip()
+    # Strip any remaining tags
+    parts = []
+    pos = 0
+    while True:
+        lt = content.find("<", pos)
+        gt = content.find(">", lt + 2) if lt >= 0 else -1
+        if gt < 0:
+            parts.append(content[pos:])
+            break
+        if content[lt + 1] == ">":
+            # "<>" is not a tag; resume scanning after the "<"
+            parts.append(content[pos:lt + 1])
+            pos = lt + 1
+            continue
+        parts.append(content[pos:lt])
+        pos = gt + 1
+    
+    return "".join(parts).strip()
+
+
+_ARG_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+# (old, new) argument names used by the various edit tools
+_EDIT_KEYS = (("old_str", "new_str"), ("search", "replace"), ("oldText", "newText"))
+
+
+def _shorten(value: Any, limit: int) -> str:
+    """Clip to limit chars (marking the cut with "...") and escape newlines"""
+    text = value if isinstance(value, str) else str(value)
+    if len(text) > limit:
+        text = text[:limit] + "..."
+    return text.replace("\n", "\\n")
+
+
+def _clip_json(value: Any, limit: int) -> str:
+    """json.dumps(value) clipped to limit chars, encoding only what is shown"""
+    parts = []
+    size = 0
+    for chunk in _ARG_ENCODER.iterencode(value):
+        parts.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            return "".join(parts)[:limit - 3] + "..."
+    return "".join(parts)
 
 
 def _format_tool_call(name: str, tool_input: Dict[str, Any]) -> str:
@@ -123,16 +262,10 @@ def _format_tool_call(name: str, tool_input: Dict[str, Any]) -> str:
         key_parts.append(f"`{cmd}`")
     
     # Edit patterns
-    for old_key, new_key in [("old_str", "new_str"), ("search", "replace"), ("oldText", "newText")]:
+    for old_key, new_key in _EDIT_KEYS:
         if old_key in tool_input and new_key in tool_input:
-            old = str(tool_input[old_key])[:40]
-            new = str(tool_input[new_key])[:40]
-            if len(tool_input[old_key]) > 40:
-                old += "..."
-            if len(tool_input[new_key]) > 40:
-                new += "..."
-            old = old.replace("\n", "\\n")
-            new = new.replace("\n", "\\n")
+            old = _shorten(tool_input[old_key], 40)
+            new = _shorten(tool_input[new_key], 40)
             key_parts.append(f'"{old}" → "{new}"')
             break
     
@@ -145,16 +278,19 @@ def _format_tool_call(name: str, tool_input: Dict[str, Any]) -> str:
     if key_parts:
         return f"[{name}] {' '.join(key_parts)}"
     else:
-        arg_str = json.dumps(tool_input, ensure_ascii=False)
-        if len(arg_str) > 60:
-            arg_str = arg_str[:57] + "..."
-        return f"[{name}] {arg_str}"
+        return f"[{name}] {_clip_json(tool_input, 60)}"
 
 
-def _format_tool_result(name: str, is_error: bool, content: str) -> str:
+def _format_tool_result(name: str, is_error: bool, content: Any) -> str:
     """Format tool result with status and truncated output"""
     status = "✗" if is_error else "✓"
     
+    # Only non-text payloads need flattening or stringifying
+    if isinstance(content, list):
+        content = _extract_text_from_content(content)
+    elif not isinstance(content, str):
+        content = str(content)
+    
     if not content or content == "(no content)":
         return f"TOOL [{name}]: {status}"
     
@@ -167,139 +303,155 @@ def _format_tool_result(name: str, is_error: bool, content: str) -> str:
         return f"TOOL [{name}]: {status} {truncated}"
 
 
-def process_session(records: Iterable[Dict[str, Any]]) -> List[str]:
-    """Process Claude Code session records into diagnostic output"""
-    output = []
-    pending_tools: Dict[str, str] = {}  # tool_use_id -> name
+def _assistant_text_lines(text_parts: List[str]) -> List[str]:
+    """Prefix the first text line with "A:" and indent the non-blank rest"""
+    lines: List[str] = []
+    for part in text_parts:
+        for line in part.split("\n"):
+            if not lines:
+                lines.append(f"A: {line}")
+            elif line.strip():
+                lines.append(f"   {line}")
+    return lines
+
+
+def _handle_user(content: Any, pending_tools: OrderedDict[str, str]) -> Iterator[str]:
+    """Format user content: slash commands, tool results and plain text"""
+    # Check for command/output patterns
+    if isinstance(content, str):
+        if '<command-name>' in content:
+            cmd_name = _tag_text(content, "command-name")
+            if cmd_name:
+                yield f"USER: [cmd] {cmd_name}"
+        elif '<local-command-stdout>' in content:
+            cleaned = _clean_xml_content(content)
+            if cleaned:
+                yield f"TOOL [cmd]: ✓ {_truncate(cleaned)}"
+        else:
+            # Skip certain system messages
+            if content and not content.startswith(_SKIP_USER_PREFIXES):
+                yield f"USER: {content}"
+    
+    elif isinstance(content, list):
+        text_parts = []
+        for item in content:
+            if isinstance(item, dict) and item.get("type") == "text":
+                text = item.get("text", "")
+                if text:
+                    # Check for XML command patterns
+                    if '<command-name>' in text:
+                        cmd_name = _tag_text(text, "command-name")
+                        if cmd_name:
+                            text_parts.append(f"[cmd] {cmd_name}")
+                    elif '<local-command-stdout>' in text:
+                        cleaned = _clean_xml_content(text)
+                        if cleaned:
+                            yield f"TOOL [cmd]: ✓ {_truncate(cleaned)}"
+                    else:
+                        text_parts.append(text)
+            
+            elif isinstance(item, dict) and item.get("type") == "tool_result":
+                tool_use_id = item.get("tool_use_id", "")
+                is_error = item.get("is_error", False)
+                result_content = item.get("content", "")
+                name = pending_tools.pop(tool_use_id, "tool")
+                yield _format_tool_result(name, is_error, result_content)
+        
+        if text_parts:
+            full_text = "\n".join(text_parts)
+            # Skip system injections
+            if not full_text.startswith(_INJECTED_PREFIXES):
+                yield f"USER: {full_text}"
+
+
+def _handle_assistant(content: Any, pending_tools: OrderedDict[str, str]) -> Iterator[str]:
+    """Format assistant content: text plus tool calls, recording tool ids"""
+    text_parts = []
+    tool_parts = []
+    
+    if isinstance(content, list):
+        for item in content:
+            if not isinstance(item, dict):
+                continue
+            
+            itype = item.get("type")
+            
+            if itype == "text":
+                text = item.get("text", "")
+                if text and isinstance(text, str):
+                    text_parts.append(text.strip())
+            
+            elif itype == "tool_use":
+                name = item.get("name", "tool")
+                tool_input = item.get("input", {})
+                tool_use_id = item.get("id", "")
+                
+                if tool_use_id:
+                    pending_tools[tool_use_id] = name
+                    pending_tools.move_to_end(tool_use_id)
+                    # Results that never arrive would otherwise pile up
+                    if len(pending_tools) > MAX_PENDING_TOOLS:
+                        pending_tools.popitem(last=False)
+                
+                formatted = _format_tool_call(name, tool_input if isinstance(tool_input, dict) else {})
+                tool_parts.append(f"  {formatted}")
+            
+            # Skip thinking blocks entirely
+    
+    elif isinstance(content, str):
+        text_parts.append(content)
+    
+    if text_parts or tool_parts:
+        lines = _assistant_text_lines(text_parts)
+        if tool_parts:
+            if not text_parts:
+                lines.append("A:")
+            lines.extend(tool_parts)
+        yield "\n".join(lines)
+
+
+# Keyed on message role
+_ROLE_HANDLERS: Dict[Any, Callable[[Any, OrderedDict[str, str]], Iterator[str]]] = {
+    "user": _handle_user,
+    "assistant": _handle_assistant,
+}
+_MESSAGE_TYPES = frozenset(_ROLE_HANDLERS)
+
+
+def process_session(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Process Claude Code session records into diagnostic output, streaming blocks"""
+    pending_tools: OrderedDict[str, str] = OrderedDict()  # tool_use_id -> name
     
     for rec in records:
-        rec_type = rec.get("type")
+        rec_get = rec.get
+        rec_type = rec_get("type")
+        
+        # Most non-message records are dropped on their type alone; only a
+        # compact summary (never a file-history-snapshot) survives
+        if rec_type not in _MESSAGE_TYPES and (
+            rec_type == "file-history-snapshot" or not rec_get("isCompactSummary")
+        ):
+            continue
         
         # Skip metadata records
-        if rec.get("isMeta") or rec_type == "file-history-snapshot":
+        if rec_get("isMeta"):
             continue
         
         # Compact summaries are useful context
-        if rec.get("isCompactSummary"):
-            message = rec.get("message", {})
+        if rec_get("isCompactSummary"):
+            message = rec_get("message", {})
             content = message.get("content", "")
             if content and isinstance(content, str):
-                output.append(f"[COMPACT SUMMARY]\n{_truncate(content, max_lines=12, max_chars=800)}")
+                yield f"[COMPACT SUMMARY]\n{_truncate(content, max_lines=12, max_chars=800)}"
             continue
         
-        if rec_type not in ("user", "assistant"):
-            continue
-        
-        message = rec.get("message", {})
+        message = rec_get("message", {})
         if not isinstance(message, dict):
             continue
         
-        role = message.get("role")
-        content = message.get("content", [])
-        
-        if role == "user":
-            # Check for command/output patterns
-            if isinstance(content, str):
-                if '<command-name>' in content:
-                    cmd_match = re.search(r'<command-name>([^<]+)</command-name>', content)
-                    if cmd_match:
-                        output.append(f"USER: [cmd] {cmd_match.group(1)}")
-                elif '<local-command-stdout>' in content:
-                    cleaned = _clean_xml_content(content)
-                    if cleaned:
-                        output.append(f"TOOL [cmd]: ✓ {_truncate(cleaned)}")
-                else:
-                    # Skip certain system messages
-                    if (content and 
-                        not content.startswith('Caveat:') and
-                        not content.startswith('This session is being continued') and
-                        not content.startswith('With your Claude Max subscription') and
-                        not content.startswith('[Request interrupted')):
-                        output.append(f"USER: {content}")
-            
-            elif isinstance(content, list):
-                text_parts = []
-                for item in content:
-                    if isinstance(item, dict) and item.get("type") == "text":
-                        text = item.get("text", "")
-                        if text:
-                            # Check for XML command patterns
-                            if '<command-name>' in text:
-                                cmd_match = re.search(r'<command-name>([^<]+)</command-name>', text)
-                                if cmd_match:
-                                    text_parts.append(f"[cmd] {cmd_match.group(1)}")
-                            elif '<local-command-stdout>' in text:
-                                cleaned = _clean_xml_content(text)
-                                if cleaned:
-                                    output.append(f"TOOL [cmd]: ✓ {_truncate(cleaned)}")
-                            else:
-                                text_parts.append(text)
-                    
-                    elif isinstance(item, dict) and item.get("type") == "tool_result":
-                        tool_use_id = item.get("tool_use_id", "")
-                        is_error = item.get("is_error", False)
-                        result_content = item.get("content", "")
-                        name = pending_tools.pop(tool_use_id, "tool")
-                        
-                        if isinstance(result_content, list):
-                            result_content = _extract_text_from_content(result_content)
-                        
-                        formatted = _format_tool_result(name, is_error, str(result_content))
-                        output.append(formatted)
-                
-                if text_parts:
-                    full_text = "\n".join(text_parts)
-                    # Skip system injections
-                    if not (full_text.startswith('Caveat:') or 
-                            full_text.startswith('This session is being continued')):
-                        output.append(f"USER: {full_text}")
-        
-        elif role == "assistant":
-            text_parts = []
-            tool_parts = []
-            
-            if isinstance(content, list):
-                for item in content:
-                    if not isinstance(item, dict):
-                        continue
-                    
-                    itype = item.get("type")
-                    
-                    if itype == "text":
-                        text = item.get("text", "")
-                        if text and isinstance(text, str):
-                            text_parts.append(text.strip())
-                    
-                    elif itype == "tool_use":
-                        name = item.get("name", "tool")
-                        tool_input = item.get("input", {})
-                        tool_use_id = item.get("id", "")
-                        
-                        if tool_use_id:
-                            pending_tools[tool_use_id] = name
-                        
-                        formatted = _format_tool_call(name, tool_input if isinstance(tool_input, dict) else {})
-                        tool_parts.append(f"  {formatted}")
-                    
-                    # Skip thinking blocks entirely
-            
-            elif isinstance(content, str):
-                text_parts.append(content)
-            
-            if text_parts or tool_parts:
-                lines = []
-                if text_parts:
-                    text = "\n".join(text_parts)
-                    text_lines = text.split("\n")
-                    lines.append(f"A: {text_lines[0]}")
-                    lines.extend(f"   {l}" for l in text_lines[1:] if l.strip())
-                if tool_parts:
-                    if not text_parts:
-                        lines.append("A:")
-                    lines.extend(tool_parts)
-                output.append("\n".join(lines))
-    
-    return output
+        handler = _ROLE_HANDLERS.get(message.get("role"))
+        if handler:
+            yield from handler(message.get("content", []), pending_tools)
 
 
 def _find_default_root() -> Optional[Path]:
@@ -312,18 +464,54 @@ def _find_default_root() -> Optional[Path]:
     return None
 
 
+def _iter_jsonl_entries(root: str) -> Iterator[os.DirEntry[str]]:
+    # DirEntry caches file type (and on some platforms stat) from readdir,
+    # avoiding the Path allocation and extra syscalls of rglob()
+    try:
+        it = os.scandir(root)
+    except OSError:
+        return
+    with it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                yield from _iter_jsonl_entries(entry.path)
+            elif entry.name.endswith(".jsonl"):
+                yield entry
+
+
 def _find_latest_jsonl(root: Path) -> Optional[Path]:
-    newest: Optional[Path] = None
+    newest: Optional[str] = None
     newest_mtime: float = -1
-    for p in root.rglob("*.jsonl"):
+    for entry in _iter_jsonl_entries(str(root)):
         try:
-            st = p.stat()
+            mtime = entry.stat().st_mtime
         except OSError:
             continue
-        if st.st_mtime > newest_mtime:
-            newest_mtime = st.st_mtime
-            newest = p
-    return newest
+        if mtime > newest_mtime:
+            newest_mtime = mtime
+            newest = entry.path
+    return Path(newest) if newest else None
+
+
+def _write_blocks(blocks: Iterable[str]) -> bool:
+    """Write blocks separated by blank lines in batches; return False if none"""
+    out = sys.stdout.buffer
+    buf: List[bytes] = []
+    found = False
+    for block in blocks:
+        found = True
+        buf.append(block.encode("utf-8"))
+        buf.append(b"\n\n")
+        if len(buf) >= WRITE_BATCH_SIZE:
+            out.writelines(buf)
+            buf.clear()
+    out.writelines(buf)
+    out.flush()
+    return found
 
 
 def main(argv: Optional[List[str]] = None) -> int:
@@ -345,7 +533,7 @@ def main(argv: Optional[List[str]] = None) -> int:
     
     # Determine input source
     if args.jsonl == "-":
-        records = list(_iter_stdin())
+        records = _iter_stdin()
     elif args.latest or not args.jsonl:
         root = _find_default_root()
         if not root:
@@ -356,7 +544,7 @@ def main(argv: Optional[List[str]] = None) -> int:
             print(f"No .jsonl files found under {root}", file=sys.stderr)
             return 1
         print(f"# Source: {latest}", file=sys.stderr)
-        records = list(_iter_jsonl(latest))
+        records = _iter_jsonl(latest)
     else:
         jsonl_path = Path(os.path.expanduser(args.jsonl))
         if jsonl_path.is_dir():
@@ -368,18 +556,12 @@ def main(argv: Optional[List[str]] = None) -> int:
         if not jsonl_path.exists():
             print(f"File not found: {jsonl_path}", file=sys.stderr)
             return 2
-        records = list(_iter_jsonl(jsonl_path))
+        records = _iter_jsonl(jsonl_path)
     
-    output = process_session(records)
-    
-    if not output:
+    if not _write_blocks(process_session(records)):
         print("No conversation found", file=sys.stderr)
         return 1
     
-    for item in output:
-        print(item)
-        print()
-    
     return 0
 
 
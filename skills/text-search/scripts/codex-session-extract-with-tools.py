@@ -21,46 +21,92 @@ from __future__ import annotations
 
 import argparse
 import json
+import mmap
 import os
 import sys
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# orjson is optional; it parses raw bytes several times faster than json
+_loads: Callable[[Union[bytes, str]], Any]
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 
 MAX_OUTPUT_LINES = 8
 MAX_OUTPUT_CHARS = 500
-
-
-def _iter_jsonl(path: Path) -> Iterable[Dict[str, Any]]:
-    with path.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+READ_BUFFER_SIZE = 1 << 20
+WRITE_BATCH_SIZE = 256  # buffered output chunks per writelines() call
+
+# Context blocks injected as user messages
+_SKIP_USER_PREFIXES = ("<environment_context>", "<user_instructions>")
+
+# Spellings seen across Codex versions
+_FUNCTION_CALL_TYPES = frozenset({"function_call", "function-call", "functioncall"})
+_FUNCTION_OUTPUT_TYPES = frozenset({"function_call_output", "function-output", "functionoutput"})
+_TEXT_ITEM_TYPES = frozenset({"text", "output_text"})
+_TOOL_ITEM_TYPES = frozenset({"tool_use", "function_call"})
+_USER_ROLES = frozenset({"human", "user", "end-user"})
+_ASSISTANT_ROLES = frozenset({"assistant", "ai", "bot"})
+
+
+def _iter_lines(lines: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    for line in lines:
+        # Blank lines are the only ones worth skipping before the parser;
+        # whitespace-only lines still fail to parse and are dropped below
+        if line == b"\n" or line == b"\r\n":
+            continue
+        try:
+            rec = _loads(line)
+        except ValueError:
+            # Undecodable bytes are replaced rather than dropping the record
             try:
-                yield json.loads(line)
-            except json.JSONDecodeError:
+                rec = json.loads(line.decode("utf-8", errors="replace"))
+            except ValueError:
                 continue
+        yield rec
 
 
-def _iter_stdin() -> Iterable[Dict[str, Any]]:
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
+def _iter_mapped_lines(mm: mmap.mmap) -> Iterator[bytes]:
+    # Same slices readline() would return, newline included
+    find = mm.find
+    size = len(mm)
+    start = 0
+    while start < size:
+        end = find(b"\n", start) + 1 or size
+        yield mm[start:end]
+        start = end
+
+
+def _iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("rb", buffering=READ_BUFFER_SIZE) as f:
         try:
-            yield json.loads(line)
-        except json.JSONDecodeError:
-            continue
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Empty files and pipes cannot be mapped
+            yield from _iter_lines(f)
+            return
+        with mm:
+            yield from _iter_lines(_iter_mapped_lines(mm))
+
+
+def _iter_stdin() -> Iterator[Dict[str, Any]]:
+    with open(sys.stdin.fileno(), "rb", buffering=READ_BUFFER_SIZE, closefd=False) as f:
+        yield from _iter_lines(f)
 
 
 def _truncate(text: str, max_lines: int = MAX_OUTPUT_LINES, max_chars: int = MAX_OUTPUT_CHARS) -> str:
     if not text:
         return ""
     
-    lines = text.split("\n")
-    if len(lines) > max_lines:
-        text = "\n".join(lines[:max_lines]) + f"\n  ... ({len(lines) - max_lines} more lines)"
+    # Count first so short outputs never allocate a list of lines
+    newlines = text.count("\n")
+    if newlines >= max_lines:
+        head = text.split("\n", max_lines)[:max_lines]
+        text = "\n".join(head) + f"\n  ... ({newlines + 1 - max_lines} more lines)"
     
     if len(text) > max_chars:
         text = text[:max_chars] + f"... ({len(text) - max_chars} more chars)"
@@ -68,31 +114,86 @@ def _truncate(text: str, max_lines: int = MAX_OUTPUT_LINES, max_chars: int = MAX
     return text
 
 
+# Characters a JSON document can start with, including leading whitespace
+_JSON_START_CHARS = frozenset('{["-0123456789tfnNI \t\r\n')
+_JSON_ERRORS = (ValueError, TypeError, RecursionError)
+
+
 def _safe_json_loads(s: str) -> Any:
+    # Plain-text arguments (paths, commands) are common; skip the parser and
+    # its exception for anything that cannot be JSON
+    if not s or s[0] not in _JSON_START_CHARS:
+        return None
+    try:
+        return _loads(s)
+    except _JSON_ERRORS:
+        if _loads is json.loads:
+            return None
+    # orjson rejects NaN, Infinity and out-of-range floats, which json accepts
     try:
         return json.loads(s)
-    except:
+    except _JSON_ERRORS:
         return None
 
 
+_FLATTEN_TEXT_KEYS = ("text", "content", "message", "body", "display_text")
+
+
+def _flatten_list(v: List[Any]) -> str:
+    parts = [_flatten_text(item) for item in v]
+    return "\n".join(p for p in parts if p)
+
+
+def _flatten_dict(v: Dict[str, Any]) -> str:
+    for key in _FLATTEN_TEXT_KEYS:
+        if key in v:
+            return _flatten_text(v[key])
+    parts = [_flatten_text(vv) for vv in v.values()]
+    return "\n".join(p for p in parts if p)
+
+
+# Keyed on exact type: decoded JSON only ever yields these builtins
+_FLATTEN_HANDLERS: Dict[type, Callable[[Any], str]] = {
+    str: lambda v: v,
+    int: str,
+    float: str,
+    list: _flatten_list,
+    dict: _flatten_dict,
+}
+
+
 def _flatten_text(v: Any) -> str:
     """Extract readable text from various shapes"""
     if v is None:
         return ""
-    if isinstance(v, str):
-        return v
-    if isinstance(v, (int, float)):
-        return str(v)
-    if isinstance(v, list):
-        parts = [_flatten_text(item) for item in v]
-        return "\n".join(p for p in parts if p)
-    if isinstance(v, dict):
-        for key in ("text", "content", "message", "body", "display_text"):
-            if key in v:
-                return _flatten_text(v[key])
-        parts = [_flatten_text(vv) for vv in v.values()]
-        return "\n".join(p for p in parts if p)
-    return str(v)
+    handler = _FLATTEN_HANDLERS.get(type(v))
+    return handler(v) if handler else str(v)
+
+
+_ARG_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+# (old, new) argument names used by the various edit tools
+_EDIT_KEYS = (("old_str", "new_str"), ("search", "replace"), ("oldText", "newText"))
+
+
+def _shorten(value: Any, limit: int) -> str:
+    """Clip to limit chars (marking the cut with "...") and escape newlines"""
+    text = value if isinstance(value, str) else str(value)
+    if len(text) > limit:
+        text = text[:limit] + "..."
+    return text.replace("\n", "\\n")
+
+
+def _clip_json(value: Any, limit: int) -> str:
+    """json.dumps(value) clipped to limit chars, encoding only what is shown"""
+    parts = []
+    size = 0
+    for chunk in _ARG_ENCODER.iterencode(value):
+        parts.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            return "".join(parts)[:limit - 3] + "..."
+    return "".join(parts)
 
 
 def _format_tool_call(name: str, args: Any) -> str:
@@ -123,16 +224,10 @@ def _format_tool_call(name: str, args: Any) -> str:
         key_parts.append(f"`{cmd}`")
     
     # Edit patterns
-    for old_key, new_key in [("old_str", "new_str"), ("search", "replace"), ("oldText", "newText")]:
+    for old_key, new_key in _EDIT_KEYS:
         if old_key in args and new_key in args:
-            old = str(args[old_key])[:40]
-            new = str(args[new_key])[:40]
-            if len(args[old_key]) > 40:
-                old += "..."
-            if len(args[new_key]) > 40:
-                new += "..."
-            old = old.replace("\n", "\\n")
-            new = new.replace("\n", "\\n")
+            old = _shorten(args[old_key], 40)
+            new = _shorten(args[new_key], 40)
             key_parts.append(f'"{old}" → "{new}"')
             break
     
@@ -142,10 +237,7 @@ def _format_tool_call(name: str, args: Any) -> str:
     if key_parts:
         return f"[{name}] {' '.join(key_parts)}"
     else:
-        arg_str = json.dumps(args, ensure_ascii=False)
-        if len(arg_str) > 60:
-            arg_str = arg_str[:57] + "..."
-        return f"[{name}] {arg_str}"
+        return f"[{name}] {_clip_json(args, 60)}"
 
 
 def _format_tool_result(name: str, is_error: bool, content: str) -> str:
@@ -164,7 +256,7 @@ def _format_tool_result(name: str, is_error: bool, content: str) -> str:
         return f"TOOL [{name}]: {status} {truncated}"
 
 
-def _extract_role_and_text(obj: Dict) -> Tuple[str, str]:
+def _extract_role_and_text(obj: Dict[str, Any]) -> Tuple[str, str]:
     """Extract role and text from various Codex message shapes"""
     role = None
     text = ""
@@ -202,120 +294,141 @@ def _extract_role_and_text(obj: Dict) -> Tuple[str, str]:
         role = obj.get("type") or obj.get("record_type") or "unknown"
     role = str(role).lower()
     
-    if role in ("human", "user", "end-user"):
+    if role in _USER_ROLES:
         role = "user"
-    elif role in ("assistant", "ai", "bot"):
+    elif role in _ASSISTANT_ROLES:
         role = "assistant"
     
     return role, text or ""
 
 
-def process_session(records: Iterable[Dict[str, Any]]) -> List[str]:
-    """Process Codex session records into diagnostic output"""
-    output = []
+def _assistant_text_lines(text_parts: List[str]) -> List[str]:
+    """Prefix the first text line with "A:" and indent the non-blank rest"""
+    lines: List[str] = []
+    for part in text_parts:
+        for line in part.split("\n"):
+            if not lines:
+                lines.append(f"A: {line}")
+            elif line.strip():
+                lines.append(f"   {line}")
+    return lines
+
+
+def _handle_reasoning(obj: Dict[str, Any]) -> Iterator[str]:
+    """Reasoning traces - include summary only"""
+    summary_list = obj.get("summary") or []
+    if isinstance(summary_list, dict):
+        summary_list = [summary_list]
+    for s in summary_list:
+        if isinstance(s, dict):
+            text = s.get("text", "")
+            if text:
+                yield f"A: [reasoning] {_truncate(text, max_lines=4, max_chars=200)}"
+
+
+def _handle_function_call(obj: Dict[str, Any]) -> Iterator[str]:
+    name = obj.get("name") or obj.get("function") or obj.get("func") or "unknown"
+    args = obj.get("arguments") or obj.get("args") or obj.get("parameters") or {}
+    formatted = _format_tool_call(name, args)
+    yield f"A:\n  {formatted}"
+
+
+def _handle_function_output(obj: Dict[str, Any]) -> Iterator[str]:
+    name = obj.get("name") or obj.get("function") or "tool"
+    content = _flatten_text(obj.get("output") or obj.get("content") or obj.get("result"))
+    is_error = bool(obj.get("error") or obj.get("is_error") or obj.get("isError"))
+    yield _format_tool_result(name, is_error, content)
+
+
+def _handle_response_item(obj: Dict[str, Any]) -> Iterator[str]:
+    """Response items (Codex uses payload wrapper)"""
+    payload = obj.get("payload", {})
+    if not isinstance(payload, dict):
+        return
     
-    for obj in records:
-        typ = str(obj.get("type") or obj.get("record_type") or "").lower()
-        
-        # Skip session metadata
-        if typ == "session_meta":
-            continue
+    msg_type = payload.get("type")
+    role = payload.get("role", "")
+    content = payload.get("content", [])
+    
+    if role == "user" or msg_type == "user":
+        text = _flatten_text(content)
+        if text and not text.startswith(_SKIP_USER_PREFIXES):
+            # Skip system injection blocks
+            if len(text) > 500 and ("<" in text[:50] and ">" in text[:100]):
+                return
+            yield f"USER: {text}"
+    
+    elif role == "assistant" or msg_type == "assistant":
+        text_parts = []
+        tool_parts = []
         
-        # Reasoning traces - include summary only
-        if typ == "reasoning":
-            summary_list = obj.get("summary") or []
-            if isinstance(summary_list, dict):
-                summary_list = [summary_list]
-            for s in summary_list:
-                if isinstance(s, dict):
-                    text = s.get("text", "")
-                    if text:
-                        output.append(f"A: [reasoning] {_truncate(text, max_lines=4, max_chars=200)}")
-            continue
+        if isinstance(content, list):
+            for item in content:
+                if not isinstance(item, dict):
+                    continue
+                itype = item.get("type", "")
+                
+                if itype in _TEXT_ITEM_TYPES:
+                    t = item.get("text", "")
+                    if t and isinstance(t, str):
+                        text_parts.append(t.strip())
+                
+                elif itype in _TOOL_ITEM_TYPES:
+                    name = item.get("name") or item.get("function") or "tool"
+                    args = item.get("input") or item.get("arguments") or {}
+                    formatted = _format_tool_call(name, args)
+                    tool_parts.append(f"  {formatted}")
         
-        # Function calls
-        if typ in ("function_call", "function-call", "functioncall"):
-            name = obj.get("name") or obj.get("function") or obj.get("func") or "unknown"
-            args = obj.get("arguments") or obj.get("args") or obj.get("parameters") or {}
-            formatted = _format_tool_call(name, args)
-            output.append(f"A:\n  {formatted}")
-            continue
+        elif isinstance(content, str):
+            text_parts.append(content)
         
-        # Function call output
-        if typ in ("function_call_output", "function-output", "functionoutput"):
-            name = obj.get("name") or obj.get("function") or "tool"
-            content = _flatten_text(obj.get("output") or obj.get("content") or obj.get("result"))
-            is_error = bool(obj.get("error") or obj.get("is_error") or obj.get("isError"))
-            formatted = _format_tool_result(name, is_error, content)
-            output.append(formatted)
-            continue
+        if text_parts or tool_parts:
+            lines = _assistant_text_lines(text_parts)
+            if tool_parts:
+                if not text_parts:
+                    lines.append("A:")
+                lines.extend(tool_parts)
+            yield "\n".join(lines)
+
+
+def _handle_generic(obj: Dict[str, Any]) -> Iterator[str]:
+    """Generic message handling for records without a known type"""
+    role, text = _extract_role_and_text(obj)
+    if role == "user" and text:
+        # Skip system blocks
+        if not (text.startswith("<") and ">" in text[:100]):
+            yield f"USER: {text}"
+    elif role == "assistant" and text:
+        yield f"A: {text}"
+
+
+# Keyed on the lowercased record type; anything else is handled generically
+_TYPE_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Iterator[str]]] = {
+    "reasoning": _handle_reasoning,
+    "response_item": _handle_response_item,
+    **dict.fromkeys(_FUNCTION_CALL_TYPES, _handle_function_call),
+    **dict.fromkeys(_FUNCTION_OUTPUT_TYPES, _handle_function_output),
+}
+_KNOWN_TYPES = frozenset(_TYPE_HANDLERS) | {"session_meta"}
+
+
+def process_session(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Process Codex session records into diagnostic output, streaming blocks"""
+    
+    for obj in records:
+        typ = obj.get("type") or obj.get("record_type") or ""
+        # Known tags are already lowercase: their membership test reuses the
+        # str's cached hash for the dispatch below, skipping lower() + rehash
+        if typ.__class__ is not str:
+            typ = str(typ).lower()
+        elif typ not in _KNOWN_TYPES:
+            typ = typ.lower()
         
-        # Response items (Codex uses payload wrapper)
-        if typ == "response_item":
-            payload = obj.get("payload", {})
-            if not isinstance(payload, dict):
-                continue
-            
-            msg_type = payload.get("type")
-            role = payload.get("role", "")
-            content = payload.get("content", [])
-            
-            if role == "user" or msg_type == "user":
-                text = _flatten_text(content)
-                if text and not text.startswith("<environment_context>") and not text.startswith("<user_instructions>"):
-                    # Skip system injection blocks
-                    if len(text) > 500 and ("<" in text[:50] and ">" in text[:100]):
-                        continue
-                    output.append(f"USER: {text}")
-            
-            elif role == "assistant" or msg_type == "assistant":
-                text_parts = []
-                tool_parts = []
-                
-                if isinstance(content, list):
-                    for item in content:
-                        if not isinstance(item, dict):
-                            continue
-                        itype = item.get("type", "")
-                        
-                        if itype in ("text", "output_text"):
-                            t = item.get("text", "")
-                            if t and isinstance(t, str):
-                                text_parts.append(t.strip())
-                        
-                        elif itype == "tool_use" or itype == "function_call":
-                            name = item.get("name") or item.get("function") or "tool"
-                            args = item.get("input") or item.get("arguments") or {}
-                            formatted = _format_tool_call(name, args)
-                            tool_parts.append(f"  {formatted}")
-                
-                elif isinstance(content, str):
-                    text_parts.append(content)
-                
-                if text_parts or tool_parts:
-                    lines = []
-                    if text_parts:
-                        text = "\n".join(text_parts)
-                        text_lines = text.split("\n")
-                        lines.append(f"A: {text_lines[0]}")
-                        lines.extend(f"   {l}" for l in text_lines[1:] if l.strip())
-                    if tool_parts:
-                        if not text_parts:
-                            lines.append("A:")
-                        lines.extend(tool_parts)
-                    output.append("\n".join(lines))
+        # Skip session metadata
+        if typ == "session_meta":
             continue
         
-        # Generic message handling
-        role, text = _extract_role_and_text(obj)
-        if role == "user" and text:
-            # Skip system blocks
-            if not (text.startswith("<") and ">" in text[:100]):
-                output.append(f"USER: {text}")
-        elif role == "assistant" and text:
-            output.append(f"A: {text}")
-    
-    return output
+        yield from _TYPE_HANDLERS.get(typ, _handle_generic)(obj)
 
 
 def _find_default_root() -> Optional[Path]:
@@ -328,18 +441,54 @@ def _find_default_root() -> Optional[Path]:
     return None
 
 
+def _iter_jsonl_entries(root: str) -> Iterator[os.DirEntry[str]]:
+    # DirEntry caches file type (and on some platforms stat) from readdir,
+    # avoiding the Path allocation and extra syscalls of rglob()
+    try:
+        it = os.scandir(root)
+    except OSError:
+        return
+    with it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                yield from _iter_jsonl_entries(entry.path)
+            elif entry.name.endswith(".jsonl"):
+                yield entry
+
+
 def _find_latest_jsonl(root: Path) -> Optional[Path]:
-    newest: Optional[Path] = None
+    newest: Optional[str] = None
     newest_mtime: float = -1
-    for p in root.rglob("*.jsonl"):
+    for entry in _iter_jsonl_entries(str(root)):
         try:
-            st = p.stat()
+            mtime = entry.stat().st_mtime
         except OSError:
             continue
-        if st.st_mtime > newest_mtime:
-            newest_mtime = st.st_mtime
-            newest = p
-    return newest
+        if mtime > newest_mtime:
+            newest_mtime = mtime
+            newest = entry.path
+    return Path(newest) if newest else None
+
+
+def _write_blocks(blocks: Iterable[str]) -> bool:
+    """Write blocks separated by blank lines in batches; return False if none"""
+    out = sys.stdout.buffer
+    buf: List[bytes] = []
+    found = False
+    for block in blocks:
+        found = True
+        buf.append(block.encode("utf-8"))
+        buf.append(b"\n\n")
+        if len(buf) >= WRITE_BATCH_SIZE:
+            out.writelines(buf)
+            buf.clear()
+    out.writelines(buf)
+    out.flush()
+    return found
 
 
 def main(argv: Optional[List[str]] = None) -> int:
@@ -361,7 +510,7 @@ def main(argv: Optional[List[str]] = None) -> int:
     
     # Determine input source
     if args.jsonl == "-":
-        records = list(_iter_stdin())
+        records = _iter_stdin()
     elif args.latest or not args.jsonl:
         root = _find_default_root()
         if not root:
@@ -372,7 +521,7 @@ def main(argv: Optional[List[str]] = None) -> int:
             print(f"No .jsonl files found under {root}", file=sys.stderr)
             return 1
         print(f"# Source: {latest}", file=sys.stderr)
-        records = list(_iter_jsonl(latest))
+        records = _iter_jsonl(latest)
     else:
         jsonl_path = Path(os.path.expanduser(args.jsonl))
         if jsonl_path.is_dir():
@@ -384,18 +533,12 @@ def main(argv: Optional[List[str]] = None) -> int:
         if not jsonl_path.exists():
             print(f"File not found: {jsonl_path}", file=sys.stderr)
             return 2
-        records = list(_iter_jsonl(jsonl_path))
-    
-    output = process_session(records)
+        records = _iter_jsonl(jsonl_path)
     
-    if not output:
+    if not _write_blocks(process_session(records)):
         print("No conversation found", file=sys.stderr)
         return 1
     
-    for item in output:
-        print(item)
-        print()
-    
     return 0
 
 
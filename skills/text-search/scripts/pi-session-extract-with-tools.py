@@ -23,50 +23,108 @@ import argparse
 import json
 import os
 import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import (
+    Any, BinaryIO, Callable, Deque, Dict, Generator, Iterable, Iterator, List,
+    Optional, Set, Tuple, Union, cast
+)
+
+# orjson is optional; it parses raw bytes several times faster than json
+_loads: Callable[[Union[bytes, str]], Any]
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 
 MAX_OUTPUT_LINES = 8
 MAX_OUTPUT_CHARS = 500
+READ_CHUNK_SIZE = 1 << 20
+WRITE_BATCH_SIZE = 256  # buffered output chunks per writelines() call
+PARALLEL_MIN_BYTES = 4 << 20  # smaller files are not worth a worker pool
+SPANS_PER_JOB = 4
+SPAN_BYTES = 4 << 20  # span size cap, so an early exit waits on little work
+DEFAULT_JOBS = min(4, os.cpu_count() or 1)
 
+# A tool result whose call was not seen in the same span:
+# (tool_id, fallback tool name, is_error, content)
+_DeferredResult = Tuple[str, str, bool, str]
 
-def _iter_jsonl(path: Path) -> Iterable[Dict[str, Any]]:
-    with path.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+
+def _iter_lines(lines: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    for line in lines:
+        # Records are JSON objects; blank and stray lines never reach the
+        # parser (and its exception path)
+        if line[:1] != b"{" and line.lstrip()[:1] != b"{":
+            continue
+        try:
+            rec = _loads(line)
+        except ValueError:
+            # Undecodable bytes are replaced rather than dropping the record
             try:
-                yield json.loads(line)
-            except json.JSONDecodeError:
+                rec = json.loads(line.decode("utf-8", errors="replace"))
+            except ValueError:
                 continue
+        yield rec
 
 
-def _iter_stdin() -> Iterable[Dict[str, Any]]:
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            yield json.loads(line)
-        except json.JSONDecodeError:
+def _iter_chunked_lines(f: BinaryIO) -> Iterator[bytes]:
+    """Split a binary stream on newlines, reading it in large chunks"""
+    pending: List[bytes] = []  # pieces of a line spanning chunk boundaries
+    while True:
+        chunk = f.read(READ_CHUNK_SIZE)
+        if not chunk:
+            if pending:
+                yield b"".join(pending)
+            return
+        find = chunk.find
+        start = 0
+        nl = find(b"\n")
+        if nl < 0:
+            pending.append(chunk)
             continue
+        if pending:
+            pending.append(chunk[:nl])
+            yield b"".join(pending)
+            pending.clear()
+            start = nl + 1
+            nl = find(b"\n", start)
+        while nl >= 0:
+            yield chunk[start:nl]
+            start = nl + 1
+            nl = find(b"\n", start)
+        if start < len(chunk):
+            pending.append(chunk[start:])
+
+
+def _iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("rb", buffering=READ_CHUNK_SIZE) as f:
+        yield from _iter_lines(_iter_chunked_lines(f))
+
+
+def _iter_stdin() -> Iterator[Dict[str, Any]]:
+    yield from _iter_lines(_iter_chunked_lines(sys.stdin.buffer))
 
 
 def _extract_text(content: Any) -> str:
     """Extract text from content, ignoring thinking blocks"""
-    if content is None:
-        return ""
-    if isinstance(content, str):
+    # Exact type checks: decoded JSON only yields builtin str/list/dict
+    t = type(content)
+    if t is str:
         return content.strip()
-    if isinstance(content, list):
+    if t is list:
         parts = []
         for item in content:
-            if isinstance(item, dict) and item.get("type") == "text":
-                text = item.get("text", "")
-                if isinstance(text, str) and text.strip():
-                    parts.append(text.strip())
+            if type(item) is dict and item.get("type") == "text":
+                text = item.get("text")
+                if type(text) is str:
+                    text = text.strip()
+                    if text:
+                        parts.append(text)
         return "\n".join(parts)
     return ""
 
@@ -76,9 +134,13 @@ def _truncate(text: str, max_lines: int = MAX_OUTPUT_LINES, max_chars: int = MAX
     if not text:
         return ""
     
-    lines = text.split("\n")
-    if len(lines) > max_lines:
-        text = "\n".join(lines[:max_lines]) + f"\n  ... ({len(lines) - max_lines} more lines)"
+    # Locate the cut with find() instead of splitting into a list of lines
+    newlines = text.count("\n")
+    if newlines >= max_lines:
+        end = -1
+        for _ in range(max_lines):
+            end = text.find("\n", end + 1)
+        text = text[:max(end, 0)] + f"\n  ... ({newlines + 1 - max_lines} more lines)"
     
     if len(text) > max_chars:
         text = text[:max_chars] + f"... ({len(text) - max_chars} more chars)"
@@ -86,64 +148,137 @@ def _truncate(text: str, max_lines: int = MAX_OUTPUT_LINES, max_chars: int = MAX
     return text
 
 
-def _format_tool_call(name: str, args: Dict[str, Any]) -> str:
+def _clip(text: str, limit: int) -> str:
+    """Clip to limit chars, ending in "..." when cut"""
+    return text[:limit - 3] + "..." if len(text) > limit else text
+
+
+_ARG_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+
+def _clip_json(value: Any, limit: int) -> str:
+    """json.dumps(value) clipped to limit chars, encoding only what is shown"""
+    parts = []
+    size = 0
+    for chunk in _ARG_ENCODER.iterencode(value):
+        parts.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            return "".join(parts)[:limit - 3] + "..."
+    return "".join(parts)
+
+
+_ESCAPES = str.maketrans({"\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+# Two clipping rules on purpose, each keeping its preview's older output:
+# write content fits "..." inside the limit (57 + "..."), while edit texts
+# keep limit chars and add "..." after them (40 + "...", as in _shorten in
+# the claude and codex scripts)
+
+
+def _clip_escape(text: str, limit: int) -> str:
+    """Clip like _clip, then escape control whitespace onto one line"""
+    if len(text) > limit:
+        return text[:limit - 3].translate(_ESCAPES) + "..."
+    return text.translate(_ESCAPES)
+
+
+def _shorten(text: str, limit: int) -> str:
+    """Cut to limit chars plus "...", then escape control whitespace"""
+    if len(text) > limit:
+        return text[:limit].translate(_ESCAPES) + "..."
+    return text.translate(_ESCAPES)
+
+
+def _edit_part(old: str, new: str) -> str:
+    return f'"{_shorten(old, 40)}" → "{_shorten(new, 40)}"'
+
+
+# Each formatter returns the part shown for its key, or None when a
+# higher-priority key already covers it (path over file_path, etc.)
+
+def _arg_path(args: Dict[str, Any], name: str) -> Optional[str]:
+    return args["path"]
+
+
+def _arg_file_path(args: Dict[str, Any], name: str) -> Optional[str]:
+    return None if "path" in args else args["file_path"]
+
+
+def _arg_command(args: Dict[str, Any], name: str) -> Optional[str]:
+    return f"`{_clip(args['command'], 80)}`"
+
+
+def _arg_cmd(args: Dict[str, Any], name: str) -> Optional[str]:
+    return None if "command" in args else f"`{_clip(args['cmd'], 80)}`"
+
+
+def _arg_old_text(args: Dict[str, Any], name: str) -> Optional[str]:
+    if "newText" not in args:
+        return None
+    return _edit_part(args["oldText"], args["newText"])
+
+
+def _arg_search(args: Dict[str, Any], name: str) -> Optional[str]:
+    if "replace" not in args or ("oldText" in args and "newText" in args):
+        return None
+    return _edit_part(args["search"], args["replace"])
+
+
+def _arg_pattern(args: Dict[str, Any], name: str) -> Optional[str]:
+    return f'pattern="{args["pattern"]}"'
+
+
+def _arg_query(args: Dict[str, Any], name: str) -> Optional[str]:
+    return f'"{args["query"]}"'
+
+
+def _arg_content(args: Dict[str, Any], name: str) -> Optional[str]:
+    # Content only for write-style tools (truncated)
+    if name.lower() not in ("write", "file_actions", "create"):
+        return None
+    content = _clip_escape(args["content"], 60)
+    return f'content="{content}"'
+
+
+# In display order
+_ARG_FORMATTERS: Dict[str, Callable[[Dict[str, Any], str], Optional[str]]] = {
+    "path": _arg_path,
+    "file_path": _arg_file_path,
+    "command": _arg_command,
+    "cmd": _arg_cmd,
+    "oldText": _arg_old_text,
+    "search": _arg_search,
+    "pattern": _arg_pattern,
+    "query": _arg_query,
+    "content": _arg_content,
+}
+_ARG_KEYS = frozenset(_ARG_FORMATTERS)
+_ARG_RANK = {key: rank for rank, key in enumerate(_ARG_FORMATTERS)}
+
+
+def _format_tool_call(name: str, args: Any) -> str:
     """Format tool call with key arguments only"""
-    key_parts = []
+    # One set intersection instead of probing every known key; arguments that
+    # decoded to a list or scalar go straight to the fallback
+    present = args.keys() & _ARG_KEYS if args.__class__ is dict else ()
     
-    # Common argument patterns across tools
-    if "path" in args:
-        key_parts.append(args["path"])
-    elif "file_path" in args:
-        key_parts.append(args["file_path"])
+    if len(present) == 1:
+        # Most calls carry a single known key: no list or join needed
+        part = _ARG_FORMATTERS[next(iter(present))](args, name)
+        if part is not None:
+            return f"[{name}] " + part
+    elif present:
+        key_parts = []
+        for key in sorted(present, key=_ARG_RANK.__getitem__):
+            part = _ARG_FORMATTERS[key](args, name)
+            if part is not None:
+                key_parts.append(part)
+        if key_parts:
+            return f"[{name}] {' '.join(key_parts)}"
     
-    if "command" in args:
-        cmd = args["command"]
-        # Truncate long commands
-        if len(cmd) > 80:
-            cmd = cmd[:77] + "..."
-        key_parts.append(f"`{cmd}`")
-    elif "cmd" in args:
-        cmd = args["cmd"]
-        if len(cmd) > 80:
-            cmd = cmd[:77] + "..."
-        key_parts.append(f"`{cmd}`")
-    
-    # Edit-specific: show search/replace
-    if "oldText" in args and "newText" in args:
-        old = args["oldText"][:40] + "..." if len(args["oldText"]) > 40 else args["oldText"]
-        new = args["newText"][:40] + "..." if len(args["newText"]) > 40 else args["newText"]
-        old = old.replace("\n", "\\n")
-        new = new.replace("\n", "\\n")
-        key_parts.append(f'"{old}" → "{new}"')
-    elif "search" in args and "replace" in args:
-        old = args["search"][:40] + "..." if len(args["search"]) > 40 else args["search"]
-        new = args["replace"][:40] + "..." if len(args["replace"]) > 40 else args["replace"]
-        old = old.replace("\n", "\\n")
-        new = new.replace("\n", "\\n")
-        key_parts.append(f'"{old}" → "{new}"')
-    
-    # Pattern/query for search tools
-    if "pattern" in args:
-        key_parts.append(f'pattern="{args["pattern"]}"')
-    if "query" in args:
-        key_parts.append(f'"{args["query"]}"')
-    
-    # Content for write (truncated)
-    if "content" in args and name.lower() in ("write", "file_actions", "create"):
-        content = args["content"]
-        if len(content) > 60:
-            content = content[:57] + "..."
-        content = content.replace("\n", "\\n")
-        key_parts.append(f'content="{content}"')
-    
-    if key_parts:
-        return f"[{name}] {' '.join(key_parts)}"
-    else:
-        # Fallback: show first few args
-        arg_str = json.dumps(args, ensure_ascii=False)
-        if len(arg_str) > 60:
-            arg_str = arg_str[:57] + "..."
-        return f"[{name}] {arg_str}"
+    # Fallback: show first few args
+    return f"[{name}] {_clip_json(args, 60)}"
 
 
 def _format_tool_result(name: str, is_error: bool, content: str) -> str:
@@ -153,29 +288,40 @@ def _format_tool_result(name: str, is_error: bool, content: str) -> str:
     if not content or content == "(no content)":
         return f"TOOL [{name}]: {status}"
     
+    # Short single-line results (the majority) need no truncation pass
+    if "\n" not in content and len(content) <= MAX_OUTPUT_CHARS:
+        return f"TOOL [{name}]: {status} {content}"
+    
     truncated = _truncate(content)
     # Indent continuation lines
-    lines = truncated.split("\n")
-    if len(lines) > 1:
-        indented = lines[0] + "\n" + "\n".join("  " + l for l in lines[1:])
-        return f"TOOL [{name}]: {status} {indented}"
-    else:
-        return f"TOOL [{name}]: {status} {truncated}"
+    if "\n" in truncated:
+        head, _, rest = truncated.partition("\n")
+        return f"TOOL [{name}]: {status} {head}\n  " + rest.replace("\n", "\n  ")
+    return f"TOOL [{name}]: {status} {truncated}"
 
 
-def process_session(records: Iterable[Dict[str, Any]]) -> List[str]:
-    """Process session records into diagnostic output"""
-    output = []
-    pending_tools: Dict[str, Tuple[str, str]] = {}  # id -> (name, formatted_call)
-    
+def process_session(records: Iterable[Dict[str, Any]]) -> Generator[str, None, None]:
+    """Process session records into diagnostic output, streaming blocks"""
+    # Without a span call set nothing is deferred, so every block is a str
+    yield from cast(Iterator[str], _process_records(records, {}, None))
+
+
+def _process_records(
+    records: Iterable[Dict[str, Any]],
+    pending_tools: Dict[str, str],  # id -> tool name
+    span_calls: Optional[Set[str]],  # ids called so far when formatting a span
+) -> Iterator[Union[str, _DeferredResult]]:
+    """Yield output blocks; for a span, results of outside calls are deferred"""
     for rec in records:
-        rtype = rec.get("type")
+        rget = rec.get
+        rtype = rget("type")
         
         if rtype != "message":
             continue
         
-        msg = rec.get("message", {})
-        if not isinstance(msg, dict):
+        # No {} default to allocate, and an empty message has nothing to show
+        msg = rget("message")
+        if not msg or msg.__class__ is not dict:
             continue
         
         role = msg.get("role")
@@ -183,72 +329,165 @@ def process_session(records: Iterable[Dict[str, Any]]) -> List[str]:
         if role == "user":
             text = _extract_text(msg.get("content"))
             if text:
-                output.append(f"USER: {text}")
+                yield "USER: " + text
         
         elif role == "assistant":
             content = msg.get("content", [])
-            text_parts = []
-            tool_parts = []
+            text_parts: List[str] = []
+            tool_parts: List[str] = []
+            # Bound once per message, not looked up on every content item
+            add_text = text_parts.append
+            add_tool = tool_parts.append
             
             if isinstance(content, list):
                 for item in content:
-                    if not isinstance(item, dict):
+                    # Decoded JSON is never a dict subclass; skip the MRO walk
+                    if type(item) is not dict:
                         continue
                     
-                    itype = item.get("type")
+                    item_get = item.get
+                    itype = item_get("type")
                     
                     if itype == "text":
-                        t = item.get("text", "")
-                        if isinstance(t, str) and t.strip():
-                            text_parts.append(t.strip())
+                        t = item_get("text", "")
+                        if isinstance(t, str):
+                            t = t.strip()
+                            if t:
+                                add_text(t)
                     
                     elif itype == "toolCall":
-                        tool_name = item.get("name", "tool")
-                        tool_id = item.get("id", "")
-                        args = item.get("arguments", {})
+                        tool_name = item_get("name", "tool")
+                        tool_id = item_get("id", "")
+                        args = item_get("arguments", {})
                         if not isinstance(args, dict):
                             try:
                                 args = json.loads(args) if isinstance(args, str) else {}
-                            except:
+                            except ValueError:
                                 args = {}
                         
                         formatted = _format_tool_call(tool_name, args)
-                        tool_parts.append(f"  {formatted}")
+                        add_tool("  " + formatted)
                         
                         if tool_id:
-                            pending_tools[tool_id] = (tool_name, formatted)
+                            pending_tools[tool_id] = tool_name
+                            if span_calls is not None:
+                                span_calls.add(tool_id)
             
             # Build assistant output
             if text_parts or tool_parts:
                 lines = []
-                if text_parts:
-                    # Prefix first line with "A:", indent rest
-                    text = "\n".join(text_parts)
-                    text_lines = text.split("\n")
-                    lines.append(f"A: {text_lines[0]}")
-                    lines.extend(f"   {l}" for l in text_lines[1:])
+                # Prefix first line with "A:", indent rest
+                if len(text_parts) == 1:
+                    # Common case: a single block is indented in one replace()
+                    lines.append("A: " + text_parts[0].replace("\n", "\n   "))
+                else:
+                    # Split each part directly rather than joining them only
+                    # to split again
+                    add_line = lines.append
+                    for part in text_parts:
+                        for line in part.split("\n"):
+                            add_line("   " + line if lines else "A: " + line)
                 
                 if tool_parts:
                     if not text_parts:
                         lines.append("A:")
                     lines.extend(tool_parts)
                 
-                output.append("\n".join(lines))
+                yield "\n".join(lines)
         
         elif role == "toolResult":
-            tool_name = msg.get("toolName") or msg.get("tool_name") or "tool"
-            tool_id = msg.get("toolCallId") or msg.get("tool_call_id") or ""
-            is_error = bool(msg.get("isError") or msg.get("is_error"))
-            content = _extract_text(msg.get("content"))
+            mget = msg.get
+            tool_name = mget("toolName") or mget("tool_name") or "tool"
+            tool_id = mget("toolCallId") or mget("tool_call_id") or ""
+            is_error = bool(mget("isError") or mget("is_error"))
+            content = _extract_text(mget("content"))
+            
+            # The call may sit in an earlier span; let the parent resolve it
+            if span_calls is not None and tool_id not in span_calls:
+                yield (tool_id, tool_name, is_error, content)
+                continue
             
             # Use pending tool info if available
-            if tool_id in pending_tools:
-                tool_name, _ = pending_tools.pop(tool_id)
+            tool_name = pending_tools.pop(tool_id, tool_name)
             
             formatted = _format_tool_result(tool_name, is_error, content)
-            output.append(formatted)
-    
-    return output
+            yield formatted
+
+
+def _split_spans(path: Path, size: int, count: int) -> List[Tuple[int, int]]:
+    """Cut a file into about `count` byte ranges that start on line boundaries"""
+    bounds = [0]
+    with path.open("rb") as f:
+        for i in range(1, count):
+            f.seek(size * i // count)
+            f.readline()
+            pos = f.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+# Blocks, open calls and resolved call ids of one span
+_SpanResult = Tuple[List[Union[str, _DeferredResult]], Dict[str, str], List[str]]
+
+
+def _format_span(path: Path, start: int, end: int) -> _SpanResult:
+    """Worker: parse and format one span of the file"""
+    with path.open("rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    pending_tools: Dict[str, str] = {}
+    span_calls: Set[str] = set()
+    records = _iter_lines(data.split(b"\n"))
+    blocks = list(_process_records(records, pending_tools, span_calls))
+    resolved = [tool_id for tool_id in span_calls if tool_id not in pending_tools]
+    return blocks, pending_tools, resolved
+
+
+def _iter_parallel_blocks(
+    path: Path, size: int, jobs: int
+) -> Generator[str, None, None]:
+    # Workers send back formatted strings rather than parsed records:
+    # unpickling the dicts costs about as much as parsing them again
+    count = max(jobs * SPANS_PER_JOB, size // SPAN_BYTES)
+    spans = iter(_split_spans(path, size, count))
+    pending_tools: Dict[str, str] = {}
+    pool = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        # Keep only a few spans in flight rather than queueing the whole file
+        in_flight: Deque[Future[_SpanResult]] = deque(
+            pool.submit(_format_span, path, start, end)
+            for start, end in islice(spans, 2 * jobs)
+        )
+        while in_flight:
+            blocks, open_calls, resolved = in_flight.popleft().result()
+            for start, end in islice(spans, 1):
+                in_flight.append(pool.submit(_format_span, path, start, end))
+            
+            for block in blocks:
+                if isinstance(block, str):
+                    yield block
+                else:
+                    tool_id, tool_name, is_error, content = block
+                    tool_name = pending_tools.pop(tool_id, tool_name)
+                    yield _format_tool_result(tool_name, is_error, content)
+            # Replay the span's effect on the id map in order: calls it
+            # resolved itself are spent, then its open calls take over
+            for tool_id in resolved:
+                pending_tools.pop(tool_id, None)
+            pending_tools.update(open_calls)
+    finally:
+        # Stopping early (e.g. a closed pipe) must not wait on queued spans
+        pool.shutdown(cancel_futures=True)
+
+
+def _iter_file_blocks(path: Path, jobs: int) -> Generator[str, None, None]:
+    size = path.stat().st_size
+    if jobs > 1 and size >= PARALLEL_MIN_BYTES:
+        yield from _iter_parallel_blocks(path, size, jobs)
+    else:
+        yield from process_session(_iter_jsonl(path))
 
 
 def _find_default_root() -> Optional[Path]:
@@ -262,18 +501,54 @@ def _find_default_root() -> Optional[Path]:
     return None
 
 
+def _iter_jsonl_entries(root: str) -> Iterator[os.DirEntry[str]]:
+    # DirEntry caches file type (and on some platforms stat) from readdir,
+    # avoiding the Path allocation and extra syscalls of rglob()
+    try:
+        it = os.scandir(root)
+    except OSError:
+        return
+    with it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                yield from _iter_jsonl_entries(entry.path)
+            elif entry.name.endswith(".jsonl"):
+                yield entry
+
+
 def _find_latest_jsonl(root: Path) -> Optional[Path]:
-    newest: Optional[Path] = None
+    newest: Optional[str] = None
     newest_mtime: float = -1
-    for p in root.rglob("*.jsonl"):
+    for entry in _iter_jsonl_entries(str(root)):
         try:
-            st = p.stat()
+            mtime = entry.stat().st_mtime
         except OSError:
             continue
-        if st.st_mtime > newest_mtime:
-            newest_mtime = st.st_mtime
-            newest = p
-    return newest
+        if mtime > newest_mtime:
+            newest_mtime = mtime
+            newest = entry.path
+    return Path(newest) if newest else None
+
+
+def _write_blocks(blocks: Iterable[str]) -> bool:
+    """Write blocks separated by blank lines in batches; return False if none"""
+    out = sys.stdout.buffer
+    buf: List[bytes] = []
+    found = False
+    for block in blocks:
+        found = True
+        buf.append(block.encode("utf-8"))
+        buf.append(b"\n\n")
+        if len(buf) >= WRITE_BATCH_SIZE:
+            out.writelines(buf)
+            buf.clear()
+    out.writelines(buf)
+    out.flush()
+    return found
 
 
 def main(argv: Optional[List[str]] = None) -> int:
@@ -303,11 +578,17 @@ def main(argv: Optional[List[str]] = None) -> int:
         default=MAX_OUTPUT_CHARS,
         help=f"Max chars per tool output (default: {MAX_OUTPUT_CHARS})"
     )
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Worker processes for files over 4 MiB (default: {DEFAULT_JOBS})"
+    )
     args = p.parse_args(argv)
     
     # Determine input source
     if args.jsonl == "-":
-        records = list(_iter_stdin())
+        blocks = process_session(_iter_stdin())
     elif args.latest or not args.jsonl:
         root = _find_default_root()
         if not root:
@@ -318,7 +599,7 @@ def main(argv: Optional[List[str]] = None) -> int:
             print(f"No .jsonl files found under {root}", file=sys.stderr)
             return 1
         print(f"# Source: {latest}", file=sys.stderr)
-        records = list(_iter_jsonl(latest))
+        blocks = _iter_file_blocks(latest, args.jobs)
     else:
         jsonl_path = Path(os.path.expanduser(args.jsonl))
         if jsonl_path.is_dir():
@@ -330,18 +611,18 @@ def main(argv: Optional[List[str]] = None) -> int:
         if not jsonl_path.exists():
             print(f"File not found: {jsonl_path}", file=sys.stderr)
             return 2
-        records = list(_iter_jsonl(jsonl_path))
+        blocks = _iter_file_blocks(jsonl_path, args.jobs)
     
-    output = process_session(records)
+    try:
+        found = _write_blocks(blocks)
+    finally:
+        # Shuts a worker pool down promptly when writing stops early
+        blocks.close()
     
-    if not output:
+    if not found:
         print("No conversation found", file=sys.stderr)
         return 1
     
-    for item in output:
-        print(item)
-        print()
-    
     return 0
 
 